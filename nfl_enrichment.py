@@ -1,23 +1,30 @@
 def enrich_nfl_props(raw_props):
     enriched = []
+    enriched_append = enriched.append  # bound once for the outcome loop
 
     for game in raw_props:
+        # Hoist per-game lookups out of the outcome loop
+        home_team = game.get("home_team")
+        away_team = game.get("away_team")
         for bookmaker in game.get("bookmakers", []):
             for market in bookmaker.get("markets", []):
                 stat_type = market.get("key")  # e.g., player_pass_yds
+                if not stat_type:
+                    continue
+                stat_label = stat_type.replace("player_", "").replace("_", " ").title()
                 for outcome in market.get("outcomes", []):
                     try:
                         player_name = outcome["name"]
                         line = float(outcome["point"])
                         odds = float(outcome["price"])
                         probability = 1 / odds if odds > 1 else 0.0
-                        team = game.get("home_team") if game.get("home_team") in player_name else game.get("away_team")
+                        team = home_team if home_team in player_name else away_team
 
-                        enriched.append({
+                        enriched_append({
                             "player": player_name,
                             "team": team,
-                            "opponent": game.get("away_team") if team == game.get("home_team") else game.get("home_team"),
-                            "stat_type": stat_type.replace("player_", "").replace("_", " ").title(),
+                            "opponent": away_team if team == home_team else home_team,
+                            "stat_type": stat_label,
                             "line": line,
                             "odds": odds,
                             "probability": round(probability, 3),
@@ -1,12 +1,88 @@
 # nfl_odds_api.py
+import asyncio
 import os
+import threading
+import time
+import orjson
 import requests
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiohttp
+except ImportError:  # optional; the threaded fan-out below still works without it
+    aiohttp = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:  # optional; plain pooled Session without HTTP caching
+    CachedSession = None
+
+try:
+    import httpx
+except ImportError:  # optional; requests stays the HTTP/1.1 fallback
+    httpx = None
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 
 ODDS_API_KEY = os.getenv("ODDS_API_KEY")
 BASE = "https://api.the-odds-api.com/v4"
 
+def _build_session() -> requests.Session:
+    """One pooled session for every Odds API call so keep-alive connections are
+    reused across the event-list call and the per-event props calls."""
+    if CachedSession is not None:
+        # HTTP-level cache: conditional GETs (ETag/Last-Modified) turn unchanged
+        # payloads into bodyless 304s, and stale_if_error keeps serving the last
+        # good response through API 5xx spells. Event lists move slower than
+        # odds, so they get a longer TTL.
+        session = CachedSession(
+            "nfl_odds_cache",
+            backend="sqlite",
+            expire_after=15,
+            cache_control=True,
+            stale_if_error=300,
+            urls_expire_after={"*/events": 120, "*/odds": 15},
+        )
+    else:
+        session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        ),
+    )
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+_SESSION = _build_session()
+
+# HTTP/2 client: concurrent per-event GETs multiplex over one TLS connection
+# instead of N HTTP/1.1 sockets (the Odds API CDN speaks H2, and the client is
+# thread-safe under the executor). Only used when httpx is installed and the
+# requests-cache layer isn't active -- conditional 304s save more than H2
+# framing does, so the cached session keeps precedence.
+_HTTP2_CLIENT = None
+if httpx is not None and CachedSession is None:
+    try:
+        _HTTP2_CLIENT = httpx.Client(
+            http2=True,
+            timeout=20.0,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            headers={"Accept-Encoding": "gzip"},
+        )
+    except ImportError:
+        # httpx without the h2 extra raises here; stay on the requests session
+        _HTTP2_CLIENT = None
+
 # Keep this list tight to maximize hit-rate for props availability
 DEFAULT_MARKETS = [
     "player_pass_yds",
@@ -18,6 +94,43 @@ DEFAULT_MARKETS = [
     "player_receiving_tds",
 ]
 
+# Markets we actually request from the API; anything else is dropped
+VALID_PLAYER_MARKETS = frozenset(DEFAULT_MARKETS)
+
+# Accept the shorthand names callers tend to pass and map them to API keys
+MARKET_ALIASES = {
+    "pass_yds": "player_pass_yds",
+    "passing_yards": "player_pass_yds",
+    "pass_tds": "player_pass_tds",
+    "passing_tds": "player_pass_tds",
+    "rush_yds": "player_rush_yds",
+    "rushing_yards": "player_rush_yds",
+    "rush_tds": "player_rush_tds",
+    "rushing_tds": "player_rush_tds",
+    "receiving_yds": "player_receiving_yds",
+    "reception_yds": "player_receiving_yds",
+    "receiving_yards": "player_receiving_yds",
+    "receptions": "player_receptions",
+    "receiving_tds": "player_receiving_tds",
+    "reception_tds": "player_receiving_tds",
+}
+
+@lru_cache(maxsize=64)
+def _normalize_markets(markets: tuple) -> tuple:
+    """Map aliases to canonical market keys, drop unknowns, de-dupe in order.
+    Pure function of the input tuple, so repeated fetches of the same market
+    list collapse to a single cached dict lookup."""
+    out: List[str] = []
+    seen = set()
+    for m in markets:
+        key = (m or "").strip().lower()
+        key = MARKET_ALIASES.get(key, key)
+        if key in VALID_PLAYER_MARKETS and key not in seen:
+            seen.add(key)
+            out.append(key)
+    # If nothing survives normalization, fall back to the defaults
+    return tuple(out) or tuple(DEFAULT_MARKETS)
+
 PREFERRED_BOOKMAKERS = [
     "draftkings",
     "fanduel",
@@ -25,64 +138,214 @@ PREFERRED_BOOKMAKERS = [
     "caesars",
     "pointsbetus",
 ]
+PREF_RANK = {k: i for i, k in enumerate(PREFERRED_BOOKMAKERS)}
+
+class _TTLCache:
+    """Tiny thread-safe TTL cache; small enough that a cachetools dep isn't worth it."""
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._data: Dict[Any, Any] = {}
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[0] > time.time():
+                return hit[1]
+            self._data.pop(key, None)
+            return None
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + self._ttl, value)
+
+class _TokenBucket:
+    """Thread-safe token bucket so the fan-out queues locally instead of
+    bouncing off the API's per-minute limit and paying a round-trip per 429."""
+
+    def __init__(self, rate: int, per: float):
+        self._capacity = rate
+        self._tokens = float(rate)
+        self._fill_rate = rate / per
+        self._lock = threading.Lock()
+        self._last = time.monotonic()
+
+    def acquire_nowait(self) -> float:
+        """Take a token if one is available, else return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._last) * self._fill_rate
+            )
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._fill_rate
+
+    def acquire(self) -> None:
+        while True:
+            wait = self.acquire_nowait()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+# Slightly under the lower-tier 60/min so a 16-event threaded burst never
+# trips the limit in the first place
+_RATE_LIMIT = _TokenBucket(rate=55, per=60.0)
+
+# The detected sport key flips at most twice a season; bulk odds move on the
+# order of seconds-to-minutes. Short TTLs collapse back-to-back CLI/endpoint
+# calls into one network round-trip.
+_SPORT_KEY_CACHE = _TTLCache(ttl=300)
+_BULK_ODDS_CACHE = _TTLCache(ttl=20)
+# Which market keys the API actually quotes per event; markets come online
+# slowly during the week so 5 minutes is fresh enough.
+_EVENT_MARKETS_CACHE = _TTLCache(ttl=300)
+
+# In-season sport keys change on the scale of weeks; refresh hourly
+_LIVE_SPORTS_CACHE = _TTLCache(ttl=3600)
+
+# Sentinel for "probe failed / shape unknown": request the full market list
+_NO_FILTER = frozenset()
 
 def _get(url: str, params: Dict[str, Any], timeout: int = 20) -> Any:
     if not ODDS_API_KEY:
         raise RuntimeError("ODDS_API_KEY is not set")
     q = {**params, "apiKey": ODDS_API_KEY}
-    r = requests.get(url, params=q, timeout=timeout)
+    _RATE_LIMIT.acquire()
+    if _HTTP2_CLIENT is not None:
+        r = _HTTP2_CLIENT.get(url, params=q, timeout=timeout)
+        if r.status_code == 429:
+            # No retry adapter on the httpx path; honor Retry-After once
+            try:
+                retry_after = float(r.headers.get("Retry-After") or 1.0)
+            except ValueError:
+                retry_after = 1.0
+            time.sleep(min(retry_after, 10.0))
+            r = _HTTP2_CLIENT.get(url, params=q, timeout=timeout)
+        if r.status_code != 200:
+            # Body is already in memory with httpx; just cap the diagnostic
+            raise RuntimeError(f"Odds API error {r.status_code} at {url}: {r.text[:2048]}")
+        return orjson.loads(r.content)
+    # Defer the body read so error responses (e.g. a 429 rate-limit page that
+    # can be 100KB of HTML) are never fully downloaded or parsed
+    r = _SESSION.get(url, params=q, timeout=timeout, stream=True)
     if r.status_code != 200:
-        try:
-            detail = r.json()
-        except Exception:
-            detail = r.text
-        raise RuntimeError(f"Odds API error {r.status_code} at {url}: {detail}")
-    return r.json()
+        snippet = next(r.iter_content(2048, decode_unicode=True), "")
+        r.close()
+        raise RuntimeError(f"Odds API error {r.status_code} at {url}: {snippet}")
+    # orjson is ~2-3x faster than stdlib json on these dict-heavy payloads
+    return orjson.loads(r.content)
 
-def _detect_nfl_sport_key(hours_ahead: int = 48) -> str:
-    """Prefer preseason key if there are upcoming events in window, else regular."""
-    now = datetime.now(timezone.utc)
+@lru_cache(maxsize=8)
+def _iso_window_quantized(bucket_minute: int, hours_ahead: int) -> tuple:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
     end = now + timedelta(hours=hours_ahead)
-    window = {
-        "commenceTimeFrom": now.replace(microsecond=0).isoformat(),
-        "commenceTimeTo": end.replace(microsecond=0).isoformat(),
+    return (now.isoformat(), end.isoformat())
+
+def _window_params(hours_ahead: int) -> Dict[str, Any]:
+    """Commence-time window params shared by all three call sites. Quantized to
+    the minute so repeated calls build byte-identical URLs (and thus share
+    HTTP-cache keys) instead of re-running the datetime chain each time."""
+    fr, to = _iso_window_quantized(int(time.time() // 60), hours_ahead)
+    return {
+        "commenceTimeFrom": fr,
+        "commenceTimeTo": to,
         "regions": "us",
         "oddsFormat": "american",
     }
+
+def _live_sport_keys() -> frozenset:
+    """Sport keys currently in season per /sports, refreshed hourly. Returns an
+    empty set (uncached) when the call fails so the next call retries."""
+    cached = _LIVE_SPORTS_CACHE.get("keys")
+    if cached is not None:
+        return cached
+    try:
+        sports = _get(f"{BASE}/sports", {"all": "false"})
+        keys = frozenset(
+            s["key"] for s in sports if isinstance(s, dict) and s.get("key")
+        )
+    except Exception:
+        return frozenset()
+    _LIVE_SPORTS_CACHE.set("keys", keys)
+    return keys
+
+def _detect_nfl_sport_key(hours_ahead: int = 48) -> str:
+    """Prefer the preseason key while it's in season, else regular."""
+    cached = _SPORT_KEY_CACHE.get(hours_ahead)
+    if cached is not None:
+        return cached
     preseason = "americanfootball_nfl_preseason"
     regular = "americanfootball_nfl"
+    live = _live_sport_keys()
+    if live:
+        # Pure in-memory check during the regular season (the common case);
+        # no more swallowed preseason probe costing a round-trip per fetch
+        sport_key = preseason if preseason in live else regular
+    else:
+        # /sports unavailable: fall back to probing preseason events directly
+        sport_key = regular
+        try:
+            if _get(f"{BASE}/sports/{preseason}/events", _window_params(hours_ahead)):
+                sport_key = preseason
+        except Exception:
+            pass
+    _SPORT_KEY_CACHE.set(hours_ahead, sport_key)
+    return sport_key
+
+def _list_events(sport_key: str, hours_ahead: int = 48) -> List[Dict[str, Any]]:
+    return _get(f"{BASE}/sports/{sport_key}/events", _window_params(hours_ahead))
+
+def _parse_market_keys(data: Any) -> frozenset:
+    """Pull market keys out of a /markets payload, tolerating list/dict shapes."""
+    if isinstance(data, dict):
+        data = data.get("markets", [])
+    keys = set()
+    for m in data if isinstance(data, list) else []:
+        if isinstance(m, dict) and m.get("key"):
+            keys.add(m["key"])
+        elif isinstance(m, str):
+            keys.add(m)
+    return frozenset(keys)
+
+def _intersect_markets(markets: List[str], available: frozenset) -> List[str]:
+    """Drop markets the API isn't quoting for this event; keep everything when
+    the probe told us nothing."""
+    if not available:
+        return markets
+    kept = [m for m in markets if m in available]
+    return kept or markets
+
+def _event_markets(sport_key: str, event_id: str) -> frozenset:
+    """Probe which markets are populated for an event. Early-week and preseason
+    games quote only 2-3 of the 7 player markets; asking for the rest costs
+    quota and bytes for nothing."""
+    cached = _EVENT_MARKETS_CACHE.get(event_id)
+    if cached is not None:
+        return cached
     try:
-        ev = _get(f"{BASE}/sports/{preseason}/events", window)
-        if ev:
-            return preseason
+        data = _get(
+            f"{BASE}/sports/{sport_key}/events/{event_id}/markets",
+            {"regions": "us"},
+        )
+        keys = _parse_market_keys(data)
     except Exception:
-        pass
-    return regular
+        keys = _NO_FILTER
+    _EVENT_MARKETS_CACHE.set(event_id, keys)
+    return keys
 
-def _list_events(sport_key: str, hours_ahead: int = 48) -> List[Dict[str, Any]]:
-    now = datetime.now(timezone.utc)
-    end = now + timedelta(hours=hours_ahead)
-    return _get(
-        f"{BASE}/sports/{sport_key}/events",
-        {
-            "commenceTimeFrom": now.replace(microsecond=0).isoformat(),
-            "commenceTimeTo": end.replace(microsecond=0).isoformat(),
-            "regions": "us",
-            "oddsFormat": "american",
-        },
-    )
+def _event_props_params(markets: List[str]) -> Dict[str, Any]:
+    return {
+        "regions": "us",
+        "oddsFormat": "american",
+        "markets": ",".join(markets),
+        "bookmakers": ",".join(PREFERRED_BOOKMAKERS),
+    }
 
-def _event_props(sport_key: str, event_id: str, markets: List[str]) -> Dict[str, Any]:
-    """Return the event odds payload (bookmakers → markets → outcomes) for selected markets."""
-    data = _get(
-        f"{BASE}/sports/{sport_key}/events/{event_id}/odds",
-        {
-            "regions": "us",
-            "oddsFormat": "american",
-            "markets": ",".join(markets),
-            "bookmakers": ",".join(PREFERRED_BOOKMAKERS),
-        },
-    )
+def _pick_props_payload(data: Any) -> Dict[str, Any]:
     # API sometimes returns a list; normalize to single dict with bookmakers
     payloads = data if isinstance(data, list) else [data]
     # Take the first that actually has bookmakers
@@ -91,6 +354,117 @@ def _event_props(sport_key: str, event_id: str, markets: List[str]) -> Dict[str,
             return p
     return payloads[0] if payloads else {}
 
+def _event_props(sport_key: str, event_id: str, markets: List[str]) -> Dict[str, Any]:
+    """Return the event odds payload (bookmakers → markets → outcomes) for selected markets."""
+    markets = _intersect_markets(markets, _event_markets(sport_key, event_id))
+    data = _get(
+        f"{BASE}/sports/{sport_key}/events/{event_id}/odds",
+        _event_props_params(markets),
+    )
+    return _pick_props_payload(data)
+
+def _safe_event_props(sport_key: str, event_id: str, markets: List[str]) -> Optional[Dict[str, Any]]:
+    """_event_props that returns None instead of raising, for use inside the executor."""
+    try:
+        return _event_props(sport_key, event_id, markets)
+    except RuntimeError as e:
+        # Skip this event if props not available; keep the app alive
+        print(f"[NFL] Skipping event {event_id}: {e}")
+        return None
+
+# ---------- async fan-out (used when aiohttp is installed) ----------
+
+async def _aget(session: "aiohttp.ClientSession", url: str, params: Dict[str, Any]) -> Any:
+    if not ODDS_API_KEY:
+        raise RuntimeError("ODDS_API_KEY is not set")
+    q = {**params, "apiKey": ODDS_API_KEY}
+    # Same bucket as the sync path, but wait on the loop instead of blocking it
+    while True:
+        wait = _RATE_LIMIT.acquire_nowait()
+        if wait <= 0:
+            break
+        await asyncio.sleep(wait)
+    async with session.get(url, params=q) as r:
+        if r.status != 200:
+            detail = await r.text()
+            raise RuntimeError(f"Odds API error {r.status} at {url}: {detail}")
+        return orjson.loads(await r.read())
+
+async def _aevent_markets(
+    session: "aiohttp.ClientSession", sport_key: str, event_id: str
+) -> frozenset:
+    """Async twin of _event_markets, sharing its TTL cache."""
+    cached = _EVENT_MARKETS_CACHE.get(event_id)
+    if cached is not None:
+        return cached
+    try:
+        data = await _aget(
+            session,
+            f"{BASE}/sports/{sport_key}/events/{event_id}/markets",
+            {"regions": "us"},
+        )
+        keys = _parse_market_keys(data)
+    except Exception:
+        keys = _NO_FILTER
+    _EVENT_MARKETS_CACHE.set(event_id, keys)
+    return keys
+
+async def _aevent_props(
+    session: "aiohttp.ClientSession", sport_key: str, event_id: str, markets: List[str]
+) -> Optional[Dict[str, Any]]:
+    try:
+        markets = _intersect_markets(
+            markets, await _aevent_markets(session, sport_key, event_id)
+        )
+        data = await _aget(
+            session,
+            f"{BASE}/sports/{sport_key}/events/{event_id}/odds",
+            _event_props_params(markets),
+        )
+        return _pick_props_payload(data)
+    except Exception as e:
+        # Skip this event if props not available; keep the app alive
+        print(f"[NFL] Skipping event {event_id}: {e}")
+        return None
+
+async def _all_event_props_async(
+    sport_key: str, events: List[Dict[str, Any]], markets: List[str]
+) -> List[Optional[Dict[str, Any]]]:
+    """Dispatch all per-event props calls on one event loop over reused sockets."""
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=20)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(
+            *(_aevent_props(session, sport_key, ev["id"], markets) for ev in events)
+        )
+
+def _filter_prop_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop events that can't have player props before any odds call is made:
+    synthetic matchups (Pro Bowl / skills games whose teams aren't real NFL
+    teams) and games too far out for books to have released prop markets."""
+    try:
+        abbr = _team_abbreviations()
+    except Exception:
+        abbr = {}
+    cutoff = datetime.now(timezone.utc) + timedelta(hours=72)
+    kept: List[Dict[str, Any]] = []
+    for ev in events:
+        home = ev.get("home_team")
+        away = ev.get("away_team")
+        if abbr and (home not in abbr or away not in abbr):
+            print(f"[NFL] Skipping non-league matchup {away} @ {home}")
+            continue
+        commence = ev.get("commence_time")
+        if commence:
+            try:
+                start = datetime.fromisoformat(str(commence).replace("Z", "+00:00"))
+                if start > cutoff:
+                    continue
+            except ValueError:
+                pass
+        kept.append(ev)
+    return kept
+
 def fetch_nfl_props(
     markets: Optional[List[str]] = None,
     hours_ahead: int = 48,
@@ -113,26 +487,32 @@ def fetch_nfl_props(
       }, ...
     ]
     """
-    mkts = markets or DEFAULT_MARKETS
+    mkts = list(_normalize_markets(tuple(markets or DEFAULT_MARKETS)))
     sport_key = _detect_nfl_sport_key(hours_ahead)
-    events = _list_events(sport_key, hours_ahead)
+    events = _filter_prop_events(_list_events(sport_key, hours_ahead))
     if not events:
         return []
 
+    # Per-event calls are pure network I/O against one host. Prefer a single
+    # aiohttp event loop (one DNS lookup, reused sockets, no thread overhead);
+    # fall back to the thread pool when aiohttp isn't installed.
+    if aiohttp is not None:
+        payloads = asyncio.run(_all_event_props_async(sport_key, events, mkts))
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(events))) as executor:
+            payloads = list(
+                executor.map(lambda ev: _safe_event_props(sport_key, ev["id"], mkts), events)
+            )
+
     out: List[Dict[str, Any]] = []
-    for ev in events:
-        ev_id = ev["id"]
-        try:
-            props_payload = _event_props(sport_key, ev_id, mkts)
-        except RuntimeError as e:
-            # Skip this event if props not available; keep the app alive
-            print(f"[NFL] Skipping event {ev_id}: {e}")
+    for ev, props_payload in zip(events, payloads):
+        if props_payload is None:
             continue
 
         # Build event-shaped object expected by /api/nfl/props code
         out.append(
             {
-                "id": ev_id,
+                "id": ev["id"],
                 "commence_time": ev.get("commence_time"),
                 "home_team": ev.get("home_team"),
                 "away_team": ev.get("away_team"),
@@ -142,6 +522,17 @@ def fetch_nfl_props(
         )
     return out
 
+_TEAM_ABBR: Optional[Dict[str, str]] = None
+
+def _team_abbreviations() -> Dict[str, str]:
+    """Import TEAM_ABBREVIATIONS once and reuse the dict; the import stays lazy
+    so module import doesn't pull in the team map (same reason as the MLB side)."""
+    global _TEAM_ABBR
+    if _TEAM_ABBR is None:
+        from team_abbreviations import TEAM_ABBREVIATIONS
+        _TEAM_ABBR = TEAM_ABBREVIATIONS
+    return _TEAM_ABBR
+
 # ---------- Environment (totals + favored team) ----------
 
 def _bulk_odds(
@@ -150,20 +541,21 @@ def _bulk_odds(
     hours_ahead: int = 48,
 ) -> List[Dict[str, Any]]:
     """Bulk odds call for H2H/Totals works fine for NFL; use tight window."""
-    now = datetime.now(timezone.utc)
-    end = now + timedelta(hours=hours_ahead)
-    return _get(
+    cache_key = (sport_key, tuple(markets), hours_ahead)
+    cached = _BULK_ODDS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    data = _get(
         f"{BASE}/sports/{sport_key}/odds",
         {
-            "regions": "us",
-            "oddsFormat": "american",
+            **_window_params(hours_ahead),
             "dateFormat": "iso",
             "markets": ",".join(markets),
             "bookmakers": ",".join(PREFERRED_BOOKMAKERS),
-            "commenceTimeFrom": now.replace(microsecond=0).isoformat(),
-            "commenceTimeTo": end.replace(microsecond=0).isoformat(),
         },
     )
+    _BULK_ODDS_CACHE.set(cache_key, data)
+    return data
 
 def _classify_environment(total_point: float, over_odds: int, under_odds: int) -> str:
     """
@@ -176,12 +568,24 @@ def _classify_environment(total_point: float, over_odds: int, under_odds: int) -
         t = float(total_point)
     except Exception:
         return "Neutral"
-    if t >= 47.5 and (isinstance(over_odds, (int, float)) and isinstance(under_odds, (int, float)) and over_odds <= under_odds):
-        return "High"
-    if t <= 41.5 and (isinstance(over_odds, (int, float)) and isinstance(under_odds, (int, float)) and under_odds <= over_odds):
-        return "Low"
+    # Check both prices once instead of per branch
+    if isinstance(over_odds, (int, float)) and isinstance(under_odds, (int, float)):
+        if t >= 47.5 and over_odds <= under_odds:
+            return "High"
+        if t <= 41.5 and under_odds <= over_odds:
+            return "Low"
     return "Neutral"
 
+def classify_environment_batch(
+    totals: List[float], over_odds: List[int], under_odds: List[int]
+) -> List[str]:
+    """Classify a whole slate in one pass over parallel sequences (e.g. when an
+    endpoint scores every matchup for a day at once)."""
+    return [
+        _classify_environment(t, o, u)
+        for t, o, u in zip(totals, over_odds, under_odds)
+    ]
+
 def get_nfl_game_environment_map(hours_ahead: int = 72) -> Dict[str, Dict[str, Any]]:
     """
     Returns { "AWY @ HOME": {
@@ -194,21 +598,25 @@ def get_nfl_game_environment_map(hours_ahead: int = 72) -> Dict[str, Dict[str, A
         "away_team": "BUF"
     } }
     """
-    from team_abbreviations import TEAM_ABBREVIATIONS  # you already use this in MLB
+    # Local binding keeps the hot loop on a local-name lookup
+    abbr = _team_abbreviations()
 
     sport_key = _detect_nfl_sport_key(hours_ahead)
     # H2H + Totals in one bulk call (bookmakers filtered)
     data = _bulk_odds(sport_key, ["h2h", "totals"], hours_ahead)
-    env_map: Dict[str, Dict[str, Any]] = {}
+    # The per-event extraction lives in a generator of (key, value) pairs so
+    # it can be reused on its own; dict(...) just collects them
+    return dict(_iter_env_entries(data, abbr))
 
-    # Build per-event structures for quick lookup
+def _iter_env_entries(data: List[Dict[str, Any]], abbr: Dict[str, str]):
+    """Yield ("AWY @ HOME", env) pairs for each event in a bulk odds payload."""
     for event in data:
         home = event.get("home_team", "")
         away = event.get("away_team", "")
         if not home or not away:
             continue
-        home_abbr = TEAM_ABBREVIATIONS.get(home, home)
-        away_abbr = TEAM_ABBREVIATIONS.get(away, away)
+        home_abbr = abbr.get(home, home)
+        away_abbr = abbr.get(away, away)
         matchup_key = f"{away_abbr} @ {home_abbr}"
 
         total_point = None
@@ -217,22 +625,47 @@ def get_nfl_game_environment_map(hours_ahead: int = 72) -> Dict[str, Dict[str, A
         home_ml = None
         away_ml = None
 
-        for bm in event.get("bookmakers", []):
-            for market in bm.get("markets", []):
-                mkey = market.get("key")
-                if mkey == "totals":
-                    for outc in market.get("outcomes", []):
-                        if outc.get("name") == "Over":
-                            total_point = outc.get("point")
-                            over_odds = outc.get("price")
-                        elif outc.get("name") == "Under":
-                            under_odds = outc.get("price")
-                elif mkey == "h2h":
-                    for outc in market.get("outcomes", []):
-                        if outc.get("name") == home:
-                            home_ml = outc.get("price")
-                        elif outc.get("name") == away:
-                            away_ml = outc.get("price")
+        # Walk bookmakers once in preference order and index markets/outcomes
+        # by key, instead of rescanning every outcome list per field.
+        bookmakers = sorted(
+            event.get("bookmakers", []),
+            key=lambda b: PREF_RANK.get(b.get("key"), 999),
+        )
+        totals_mkt = None
+        h2h_mkt = None
+        for bm in bookmakers:
+            mkts_by_key = {m.get("key"): m for m in bm.get("markets", [])}
+            if "totals" in mkts_by_key and "h2h" in mkts_by_key:
+                totals_mkt = mkts_by_key["totals"]
+                h2h_mkt = mkts_by_key["h2h"]
+                break
+        if totals_mkt is None and h2h_mkt is None:
+            # No single book quotes both; take the best-ranked book per market
+            for bm in bookmakers:
+                for market in bm.get("markets", []):
+                    mkey = market.get("key")
+                    if mkey == "totals" and totals_mkt is None:
+                        totals_mkt = market
+                    elif mkey == "h2h" and h2h_mkt is None:
+                        h2h_mkt = market
+
+        if totals_mkt is not None:
+            outcomes = {o.get("name"): o for o in totals_mkt.get("outcomes", [])}
+            over = outcomes.get("Over")
+            under = outcomes.get("Under")
+            if over is not None:
+                total_point = over.get("point")
+                over_odds = over.get("price")
+            if under is not None:
+                under_odds = under.get("price")
+        if h2h_mkt is not None:
+            outcomes = {o.get("name"): o for o in h2h_mkt.get("outcomes", [])}
+            home_out = outcomes.get(home)
+            away_out = outcomes.get(away)
+            if home_out is not None:
+                home_ml = home_out.get("price")
+            if away_out is not None:
+                away_ml = away_out.get("price")
 
         favored_team = None
         if home_ml is not None and away_ml is not None:
@@ -240,7 +673,7 @@ def get_nfl_game_environment_map(hours_ahead: int = 72) -> Dict[str, Dict[str, A
 
         label = _classify_environment(total_point, over_odds, under_odds) if total_point is not None else "Neutral"
 
-        env_map[matchup_key] = {
+        yield matchup_key, {
             "environment": label,
             "total": total_point,
             "over_odds": over_odds,
@@ -250,8 +683,6 @@ def get_nfl_game_environment_map(hours_ahead: int = 72) -> Dict[str, Dict[str, A
             "away_team": away_abbr,
         }
 
-    return env_map
-
 # -------- CLI smoke test --------
 if __name__ == "__main__":
     try:
@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import os
 import json
@@ -13,8 +15,26 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://api.the-odds-api.com/v4"
 ODDS_API_KEY = os.getenv("ODDS_API_KEY")
 
+# Shared pooled session so back-to-back Odds API calls reuse keep-alive
+# connections instead of paying a TCP+TLS handshake per request.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+_SESSION.headers["Accept-Encoding"] = "gzip"
+
 # Preferred sportsbooks for filtering
 PREFERRED_SPORTSBOOKS = ["draftkings", "fanduel", "betmgm"]
+BOOK_RANK = {k: i for i, k in enumerate(PREFERRED_SPORTSBOOKS)}
 VALID_BOOKS = {"DraftKings", "FanDuel", "BetMGM"}
 
 def get_favored_team(game):
@@ -53,7 +73,7 @@ def parse_game_data():
     # Try preferred sportsbooks first
     try:
         print(f"[DEBUG] Fetching moneylines from preferred sportsbooks: {PREFERRED_SPORTSBOOKS}")
-        response = requests.get(
+        response = _SESSION.get(
             f"{BASE_URL}/sports/baseball_mlb/odds",
             params={
                 "apiKey": ODDS_API_KEY,
@@ -82,7 +102,7 @@ def parse_game_data():
     # Fallback to all sportsbooks
     try:
         print("[DEBUG] Fetching moneylines from all sportsbooks")
-        response = requests.get(
+        response = _SESSION.get(
             f"{BASE_URL}/sports/baseball_mlb/odds",
             params={
                 "apiKey": ODDS_API_KEY,
@@ -116,7 +136,7 @@ def get_matchup_map():
         return {}
 
     try:
-        response = requests.get(
+        response = _SESSION.get(
             f"{BASE_URL}/sports/baseball_mlb/odds",
             params={
                 "apiKey": ODDS_API_KEY,
@@ -170,7 +190,7 @@ def get_mlb_totals_odds():
 
     try:
         print("[DEBUG] Fetching MLB totals odds")
-        response = requests.get(
+        response = _SESSION.get(
             f"{BASE_URL}/sports/baseball_mlb/odds",
             params={
                 "apiKey": ODDS_API_KEY,
@@ -192,107 +212,134 @@ def get_mlb_totals_odds():
         print(f"[ERROR] Failed to fetch totals odds: {e}")
         return []
 
+def get_mlb_game_odds(markets="h2h,totals"):
+    """Fetch moneyline + totals odds for MLB games in a single bulk call"""
+    now = datetime.utcnow()
+    future = now + timedelta(hours=48)
+    start_time = now.replace(microsecond=0).isoformat() + "Z"
+    end_time = future.replace(microsecond=0).isoformat() + "Z"
+
+    if not ODDS_API_KEY:
+        print("[ERROR] ODDS_API_KEY is not set")
+        return []
+
+    try:
+        print(f"[DEBUG] Fetching MLB odds for markets: {markets}")
+        response = _SESSION.get(
+            f"{BASE_URL}/sports/baseball_mlb/odds",
+            params={
+                "apiKey": ODDS_API_KEY,
+                "regions": "us",
+                "markets": markets,
+                "oddsFormat": "american",
+                "commenceTimeFrom": start_time,
+                "commenceTimeTo": end_time,
+                "bookmakers": ",".join(PREFERRED_SPORTSBOOKS)
+            },
+            timeout=20
+        )
+        response.raise_for_status()
+        data = response.json()
+        print(f"[INFO] Retrieved {markets} odds for {len(data)} MLB games")
+        return data
+
+    except Exception as e:
+        print(f"[ERROR] Failed to fetch MLB odds: {e}")
+        return []
+
 def get_mlb_game_environment_map():
     """Get environment classification and favored team for each MLB game"""
     from mlb_game_enrichment import classify_game_environment
     from team_abbreviations import TEAM_ABBREVIATIONS
-    
-    totals_data = get_mlb_totals_odds()
-    moneyline_data = parse_game_data()  # Get moneylines for favored team calculation
+
+    # One bulk call gets both markets; the API merges them per event so we
+    # don't need a second request plus a matchup-key join in Python.
+    games = get_mlb_game_odds("h2h,totals")
     env_map = {}
-    
-    # Create a lookup for moneyline odds by team matchup
-    moneyline_lookup = {}
-    for game in moneyline_data:
-        home_team = game.get("home_team", "")
-        away_team = game.get("away_team", "")
-        
-        if home_team and away_team:
-            home_abbr = TEAM_ABBREVIATIONS.get(home_team, home_team)
-            away_abbr = TEAM_ABBREVIATIONS.get(away_team, away_team)
-            matchup_key = f"{away_abbr} @ {home_abbr}"
-            
-            # Extract moneyline odds
-            for bookmaker in game.get("bookmakers", []):
-                for market in bookmaker.get("markets", []):
-                    if market.get("key") == "h2h":  # head-to-head (moneyline)
-                        outcomes = market.get("outcomes", [])
-                        
-                        home_odds = None
-                        away_odds = None
-                        
-                        for outcome in outcomes:
-                            if outcome.get("name") == home_team:
-                                home_odds = outcome.get("price")
-                            elif outcome.get("name") == away_team:
-                                away_odds = outcome.get("price")
-                        
-                        if home_odds and away_odds:
-                            # Determine favored team
-                            favored_team = home_abbr if home_odds < away_odds else away_abbr
-                            
-                            moneyline_lookup[matchup_key] = {
-                                "home_odds": home_odds,
-                                "away_odds": away_odds,
-                                "favored_team": favored_team
-                            }
-                            break
-                if matchup_key in moneyline_lookup:
-                    break
 
-    for game in totals_data:
+    for game in games:
         try:
             home_team = game.get("home_team", "")
             away_team = game.get("away_team", "")
-            
+
             if not home_team or not away_team:
                 continue
-                
+
             # Convert to abbreviations
             home_abbr = TEAM_ABBREVIATIONS.get(home_team, home_team)
             away_abbr = TEAM_ABBREVIATIONS.get(away_team, away_team)
             matchup_key = f"{away_abbr} @ {home_abbr}"
-                
-            # Find totals market in bookmakers
-            for bookmaker in game.get("bookmakers", []):
-                for market in bookmaker.get("markets", []):
-                    if market.get("key") == "totals":
-                        outcomes = market.get("outcomes", [])
-                        
-                        total_point = None
-                        over_odds = None
-                        under_odds = None
-                        
-                        for outcome in outcomes:
-                            if outcome.get("name") == "Over":
-                                total_point = outcome.get("point")
-                                over_odds = outcome.get("price")
-                            elif outcome.get("name") == "Under":
-                                under_odds = outcome.get("price")
-                        
-                        if total_point and over_odds and under_odds:
-                            label = classify_game_environment(total_point, over_odds, under_odds)
-                            
-                            # Get favored team from moneyline lookup
-                            moneyline_info = moneyline_lookup.get(matchup_key, {})
-                            favored_team = moneyline_info.get("favored_team")
-                            
-                            env_map[matchup_key] = {
-                                "environment": label,
-                                "total": total_point,
-                                "over_odds": over_odds,
-                                "under_odds": under_odds,
-                                "favored_team": favored_team,
-                                "home_team": home_abbr,
-                                "away_team": away_abbr
-                            }
-                            
-                            fav_indicator = f" (Fav: {favored_team})" if favored_team else ""
-                            print(f"[ENV] {matchup_key}: {label} (Total: {total_point}){fav_indicator}")
-                            break
-                if matchup_key in env_map:
+
+            total_point = None
+            over_odds = None
+            under_odds = None
+            home_odds = None
+            away_odds = None
+
+            # Pick the first preferred book quoting both markets and index its
+            # markets/outcomes by key -- no rescanning per field
+            bookmakers = sorted(
+                game.get("bookmakers", []),
+                key=lambda b: BOOK_RANK.get(b.get("key"), 999)
+            )
+            totals_market = None
+            h2h_market = None
+            for bookmaker in bookmakers:
+                markets_by_key = {m.get("key"): m for m in bookmaker.get("markets", [])}
+                if "totals" in markets_by_key and "h2h" in markets_by_key:
+                    totals_market = markets_by_key["totals"]
+                    h2h_market = markets_by_key["h2h"]
                     break
-                    
+            if totals_market is None and h2h_market is None:
+                # No single book quotes both; take the best-ranked book per market
+                for bookmaker in bookmakers:
+                    for market in bookmaker.get("markets", []):
+                        mkey = market.get("key")
+                        if mkey == "totals" and totals_market is None:
+                            totals_market = market
+                        elif mkey == "h2h" and h2h_market is None:
+                            h2h_market = market
+
+            if totals_market is not None:
+                outcomes = {o.get("name"): o for o in totals_market.get("outcomes", [])}
+                over = outcomes.get("Over")
+                under = outcomes.get("Under")
+                if over is not None:
+                    total_point = over.get("point")
+                    over_odds = over.get("price")
+                if under is not None:
+                    under_odds = under.get("price")
+            if h2h_market is not None:
+                outcomes = {o.get("name"): o for o in h2h_market.get("outcomes", [])}
+                home_out = outcomes.get(home_team)
+                away_out = outcomes.get(away_team)
+                if home_out is not None:
+                    home_odds = home_out.get("price")
+                if away_out is not None:
+                    away_odds = away_out.get("price")
+
+            if not (total_point and over_odds and under_odds):
+                continue
+
+            label = classify_game_environment(total_point, over_odds, under_odds)
+
+            favored_team = None
+            if home_odds and away_odds:
+                favored_team = home_abbr if home_odds < away_odds else away_abbr
+
+            env_map[matchup_key] = {
+                "environment": label,
+                "total": total_point,
+                "over_odds": over_odds,
+                "under_odds": under_odds,
+                "favored_team": favored_team,
+                "home_team": home_abbr,
+                "away_team": away_abbr
+            }
+
+            fav_indicator = f" (Fav: {favored_team})" if favored_team else ""
+            print(f"[ENV] {matchup_key}: {label} (Total: {total_point}){fav_indicator}")
+
         except Exception as e:
             logger.debug(f"Error processing game environment for {game}: {e}")
             continue
@@ -300,58 +347,6 @@ def get_mlb_game_environment_map():
     print(f"[INFO] Classified {len(env_map)} game environments with favored teams")
     return env_map
 
-    # Try preferred sportsbooks first
-    try:
-        print(f"[DEBUG] Fetching moneylines from preferred sportsbooks: {PREFERRED_SPORTSBOOKS}")
-        response = requests.get(
-            f"{BASE_URL}/sports/baseball_mlb/odds",
-            params={
-                "apiKey": ODDS_API_KEY,
-                "regions": "us",
-                "markets": "h2h",
-                "oddsFormat": "american",
-                "commenceTimeFrom": start_time,
-                "commenceTimeTo": end_time,
-                "bookmakers": ",".join(PREFERRED_SPORTSBOOKS)
-            },
-            timeout=20
-        )
-        response.raise_for_status()
-        data = response.json()
-        print(f"[INFO] Retrieved {len(data)} moneyline matchups from preferred sportsbooks")
-        
-        # If we got good data, return it
-        if data and len(data) > 0:
-            return data
-        else:
-            print("[WARNING] No moneylines from preferred sportsbooks, falling back to all sportsbooks")
-            
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch odds from preferred sportsbooks: {e}, falling back to all sportsbooks")
-
-    # Fallback to all sportsbooks
-    try:
-        print("[DEBUG] Fetching moneylines from all sportsbooks")
-        response = requests.get(
-            f"{BASE_URL}/sports/baseball_mlb/odds",
-            params={
-                "apiKey": ODDS_API_KEY,
-                "regions": "us",
-                "markets": "h2h",
-                "oddsFormat": "american",
-                "commenceTimeFrom": start_time,
-                "commenceTimeTo": end_time
-            },
-            timeout=20
-        )
-        response.raise_for_status()
-        data = response.json()
-        print(f"[INFO] Retrieved {len(data)} moneyline matchups from all sportsbooks")
-        return data
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch odds from all sportsbooks: {e}")
-        return []
-
 def fetch_player_props():
     """Fetch player props with preferred sportsbooks first, fallback to all if needed"""
     now = datetime.utcnow()
@@ -364,7 +359,7 @@ def fetch_player_props():
         return []
 
     try:
-        event_resp = requests.get(
+        event_resp = _SESSION.get(
             f"{BASE_URL}/sports/baseball_mlb/events",
             params={
                 "apiKey": ODDS_API_KEY,
@@ -381,6 +376,7 @@ def fetch_player_props():
         return []
 
     props = []
+    props_append = props.append  # bound once; the outcome loop runs thousands of times
     print(f"[DEBUG] Starting prop collection for {len(events)} events")
     
     # Define available markets only (7 markets total) - confirmed working with API
@@ -403,7 +399,7 @@ def fetch_player_props():
                 if batch_idx > 0:
                     time.sleep(1)
                 
-                odds_resp = requests.get(
+                odds_resp = _SESSION.get(
                     f"{BASE_URL}/sports/baseball_mlb/events/{eid}/odds",
                     params={
                         "apiKey": ODDS_API_KEY,
@@ -432,15 +428,16 @@ def fetch_player_props():
                     for market in book.get("markets", []):
                         stat = market.get("key")
                         for outcome in market.get("outcomes", []):
+                            # One .get per field, bound to locals; skip before
+                            # touching "point" so dropped outcomes cost less
                             player = outcome.get("description") or outcome.get("name")
                             price = outcome.get("price")
-                            point = outcome.get("point")
 
                             if player and price is not None:
-                                props.append({
+                                props_append({
                                     "player": player,
                                     "stat": stat,
-                                    "line": point,
+                                    "line": outcome.get("point"),
                                     "odds": price,
                                     "bookmaker": book_title
                                 })